@@ -1,40 +1,35 @@
 import numpy as np
+import calendar
 import datetime
+from functools import lru_cache
 from typing import Optional, Union
 
+MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+DAYS_IN_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]  # non-leap year, as strptime defaults to 1900
+CUMULATIVE_DAYS = [sum(DAYS_IN_MONTH[:month]) for month in range(12)]
 
-def items_since_last_true(array):
-    last_true_index = -1
-    result = np.zeros_like(array, dtype=int)
-
-    for i, value in enumerate(array):
-        if value:
-            last_true_index = i
-        result[i] = i - last_true_index
 
+def items_since_last_true(array):
+    # Running maximum of the indices of True elements gives, per position, the index of the last True
+    index = np.arange(len(array))
+    last_true_index = np.where(np.asarray(array, dtype=bool), index, -1)
+    np.maximum.accumulate(last_true_index, out=last_true_index)
+    result = np.subtract(index, last_true_index, out=last_true_index)
     return result
 
 
 def fill_gaps(arr, max_gap: int = 2):
-    # Initialize an array to store lengths of false series
-    false_series_lengths = np.zeros_like(arr, dtype=int)
-
-    # Initialize a counter to keep track of the length of the current false series
-    current_length = 0
-
-    # Loop through the array to determine false series lengths
-    for i in range(len(arr)):
-        if arr[i] == False:
-            # If the element is False, increment the current length
-            current_length += 1
-        else:
-            # If the element is True, store the current length and reset the counter
-            false_series_lengths[i - current_length:i] = current_length
-            current_length = 0
-
-    # If the last series ends with False values, store its length
-    if current_length > 0:
-        false_series_lengths[-current_length:] = current_length
+    arr = np.asarray(arr, dtype=bool)
+    if arr.size == 0:
+        return np.zeros(0, dtype=bool)
+
+    # Run-length encode the array: start index and length of each series
+    run_starts = np.flatnonzero(np.r_[True, arr[1:] != arr[:-1]])
+    run_lengths = np.diff(np.r_[run_starts, len(arr)])
+
+    # Lengths of false series broadcast back to each element (zero for true elements)
+    false_series_lengths = np.repeat(run_lengths, run_lengths)
+    false_series_lengths[arr] = 0
     return false_series_lengths <= max_gap
 
 
@@ -43,20 +38,41 @@ def parse_date(input_date: Optional[Union[str, int]]) -> Optional[int]:
     Parses input_date, which can be:
     - None
     - A day of the year as an integer (e.g., "69")
+    - An ISO date string in the format "%Y-%m-%d" (e.g., "2024-03-10")
     - A date string in the format "%B %d" (e.g., "March 10")
 
     Returns:
     - None if input_date is None
-    - An integer representing the day of the year.
+    - An integer representing the day of the year. Dates are counted in a non-leap year, as for "%B %d",
+      so the year of an ISO date has no effect (e.g., "2024-03-10" and "March 10" both give 69).
     """
     if input_date is None:
         return None
     elif isinstance(input_date, int) or input_date.isdigit():
         return int(input_date)  # If input_date is a day of the year (e.g., "69")
+    elif is_iso_date(input_date):
+        iso_date = datetime.date.fromisoformat(input_date)  # If it's an ISO date (e.g., "2024-03-10")
+        return CUMULATIVE_DAYS[iso_date.month - 1] + iso_date.day
     else:
-        return (
-            datetime.datetime.strptime(input_date, "%B %d").timetuple().tm_yday
-        )  # If it's a date string (e.g., "March 10")
+        return parse_month_day(input_date)  # If it's a date string (e.g., "March 10")
+
+
+def is_iso_date(input_date: str) -> bool:
+    digits = input_date[:4] + input_date[5:7] + input_date[8:]
+    return len(input_date) == 10 and input_date[4] == input_date[7] == "-" and digits.isascii() and digits.isdigit()
+
+
+@lru_cache(maxsize=None)
+def parse_month_day(input_date: str) -> int:
+    # Equivalent to datetime.datetime.strptime(input_date, "%B %d").timetuple().tm_yday
+    parts = input_date.split()
+    if (input_date != input_date.strip() or len(parts) != 2 or parts[0].lower() not in MONTH_NUMBERS
+            or not (parts[1].isascii() and parts[1].isdigit() and len(parts[1]) <= 2)):
+        raise ValueError(f"time data '{input_date}' does not match format '%B %d'")
+    month, day = MONTH_NUMBERS[parts[0].lower()], int(parts[1])
+    if not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        raise ValueError(f"day is out of range for month: '{input_date}'")
+    return CUMULATIVE_DAYS[month - 1] + day
 
 
 def get_season_dates(start_of_season: str, end_of_season: str, year: int):
@@ -25,8 +25,11 @@ def plot_results(results: [Union[dict[str, pd.DataFrame], pd.DataFrame]], variab
     # Exclude 'Date' column from variables to be plotted
     variables = [var for var in variables if var != 'Date']
 
+    thresholds = [get_pat_threshold(), 0.99]
+
     num_variables = len(variables)
     fig, axes = plt.subplots(num_variables, 1, figsize=(10, num_variables), sharex=True)
+    legend_handles = []
     for index_results, (df_key, df) in enumerate(results.items()):
         if "Reward" in df.columns:
             reward = df["Reward"].sum()
@@ -41,8 +44,8 @@ def plot_results(results: [Union[dict[str, pd.DataFrame], pd.DataFrame]], variab
                 ax.text(0.015, 0.85, variable, transform=ax.transAxes, verticalalignment="top",horizontalalignment="left",
                         bbox=dict(facecolor='white', edgecolor='lightgrey', boxstyle='round,pad=0.25'))
 
-            ax.step(df['Date'], df[variable], label=f'{df_key} {reward_string}', where='post', alpha=alpha)
-            if i == 0: ax.legend()
+            line, = ax.step(df['Date'], df[variable], label=f'{df_key} {reward_string}', where='post', alpha=alpha)
+            if i == 0: legend_handles.append(line)
 
             if variable == 'LeafWetness':
                 ax.axhline(y=8.0, color="red", linestyle="--")
@@ -54,15 +57,17 @@ def plot_results(results: [Union[dict[str, pd.DataFrame], pd.DataFrame]], variab
                 ax.axhline(y=8.0, color="red", linestyle="--")
 
             # Add vertical line when the variable first passes the threshold
-            thresholds = [get_pat_threshold(), 0.99]
             if variable == 'AscosporeMaturation' and thresholds is not None:
+                values = df[variable].to_numpy()
                 for threshold in thresholds:
-                    exceeding_indices = df[df[variable] > threshold].index
-                    if len(exceeding_indices) > 0:
-                        first_pass_index = exceeding_indices[0]
-                        x_coordinate = df.loc[first_pass_index, 'Date']  # Get the corresponding date value
+                    exceeding_positions = np.flatnonzero(values > threshold)
+                    if exceeding_positions.size > 0:
+                        x_coordinate = df['Date'].iloc[exceeding_positions[0]]  # Get the corresponding date value
                         ax.axvline(x=x_coordinate, color='red', linestyle='--')
 
+    ax = axes[0] if num_variables > 1 else axes
+    ax.legend(handles=legend_handles)
+
     ax = axes[-1] if num_variables > 1 else axes
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
     fig.autofmt_xdate(rotation=0)
@@ -98,19 +103,23 @@ def plot_infection(infection: InfectionRate):
     discharge_duration = 90.96 * infection.infection_temperature **(-0.96)
     ax1.axvline(x=discharge_duration, color="orange", linestyle="--", label="discharge duration")
 
-    if len(infection.hours) % 24 == 0:
-        ax1.step([item for sublist in [infection.hours[index*24: min(len(infection.hours), (index+1)*24)] for index, _ in enumerate(infection.risk)] for item in sublist],
-             [item for sublist in [[entry[1]] * 24 for entry in infection.risk] for item in sublist],
-             color="orange", linestyle='solid', label="cumulative risk", where='post')
+    hours = np.asarray(infection.hours)
+    if len(hours) % 24 == 0:
+        num_days = len(infection.risk)
+        cumulative_risk = np.repeat([entry[1] for entry in infection.risk], 24)
+        ax1.step(hours[:num_days * 24], cumulative_risk,
+                 color="orange", linestyle='solid', label="cumulative risk", where='post')
 
-    dates = infection.discharge_date + pd.to_timedelta(infection.hours, unit="h")
+    dates = infection.discharge_date + pd.to_timedelta(hours, unit="h")
     unique_dates = pd.date_range(start=dates[0], end=dates[-1], freq="D")
 
-    if len(infection.hours) % 24 == 0:
-        for i, unique_date in enumerate(unique_dates):
-            ax1.axvline(x=infection.hours[i*24], color="grey", linestyle="--", linewidth=0.8)
-            ax1.text(infection.hours[i*24]+0.1, ax1.get_ylim()[1], unique_date.strftime("%Y-%m-%d"),
-                 color="grey", ha="left", va="top", rotation=90, fontsize=9)
+    if len(hours) % 24 == 0:
+        day_starts = hours[::24][:len(unique_dates)]
+        ax1.vlines(day_starts, 0, 1, transform=ax1.get_xaxis_transform(), color="grey", linestyle="--", linewidth=0.8)
+        y_top = ax1.get_ylim()[1]
+        for day_start, unique_date in zip(day_starts, unique_dates):
+            ax1.text(day_start + 0.1, y_top, unique_date.strftime("%Y-%m-%d"),
+                     color="grey", ha="left", va="top", rotation=90, fontsize=9)
 
     plt.xlabel('Time')
     plt.ylabel('Value')
@@ -128,10 +137,13 @@ def plot_precipitation_with_rain_event(df_hourly: pd.DataFrame, day: pd.Timestam
 
     plt.step(df_day['Hourly Date'], df_day['Hourly Precipitation'], where='post', label='Hourly Precipitation')
 
-    # Plot filled area for rain event
-    for idx, row in df_day.iterrows():
-        if row['Hourly Rain Event']:
-            plt.axvspan(row['Hourly Date'], row['Hourly Date'] + pd.Timedelta(hours=1), color='gray', alpha=0.3)
+    # Plot filled area for rain event, one span per consecutive series of rain event hours
+    rain_event = df_day['Hourly Rain Event'].to_numpy(dtype=bool)
+    edges = np.diff(np.r_[False, rain_event, False].astype(np.int8))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    hourly_dates = df_day['Hourly Date']
+    for start, end in zip(starts, ends):
+        plt.axvspan(hourly_dates.iloc[start], hourly_dates.iloc[end - 1] + pd.Timedelta(hours=1), color='gray', alpha=0.3)
 
     plt.xlabel('Hour of the Day')
     plt.ylabel('Precipitation')
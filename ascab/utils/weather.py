@@ -1,10 +1,7 @@
-import openmeteo_requests
-import requests_cache
-from retry_requests import retry
 import pandas as pd
 import numpy as np
-import math
-from scipy.ndimage import label
+from functools import lru_cache
+from typing import Union
 from datetime import datetime, timedelta
 from astral import LocationInfo
 from astral.sun import sun
@@ -20,8 +17,8 @@ def get_default_days_of_forecast():
     return 2
 
 
-def compute_vpd(temp: float, rh: float) -> float:
-    vp_sat = 0.6108 * math.exp((17.27 * temp) / (237.3 + temp))
+def compute_vpd(temp: Union[float, np.ndarray], rh: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    vp_sat = 0.6108 * np.exp((17.27 * temp) / (237.3 + temp))
     result = vp_sat * (1-(rh/100.0))
     return result
 
@@ -60,12 +57,26 @@ def construct_forecast(df_weather: pd.DataFrame):
             'relative_humidity_2m': df_weather[f'relative_humidity_2m_previous_day{day}'],
             'precipitation': df_weather[f'precipitation_previous_day{day}'],
         })
-        df_forecast_day_x['vapour_pressure_deficit'] = df_forecast_day_x.apply(
-            lambda row: compute_vpd(row['temperature_2m'], row['relative_humidity_2m']), axis=1)
+        df_forecast_day_x['vapour_pressure_deficit'] = compute_vpd(
+            df_forecast_day_x['temperature_2m'].to_numpy(dtype=float),
+            df_forecast_day_x['relative_humidity_2m'].to_numpy(dtype=float))
         result[day] = df_forecast_day_x
     return result
 
 
+@lru_cache(maxsize=1)
+def get_openmeteo_client():
+    # Imported here so that importing this module does not load the HTTP and cache stacks
+    import openmeteo_requests
+    import requests_cache
+    from retry_requests import retry
+
+    # Setup the Open-Meteo API client with cache and retry on error
+    cache_session = requests_cache.CachedSession(".cache", expire_after=-1)
+    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+    return openmeteo_requests.Client(session=retry_session)
+
+
 def get_meteo(params: dict, verbose: bool = False) -> pd.DataFrame:
     url = "https://previous-runs-api.open-meteo.com/v1/forecast"
     params['end_date'] = (
@@ -74,12 +85,7 @@ def get_meteo(params: dict, verbose: bool = False) -> pd.DataFrame:
     ).strftime("%Y-%m-%d")
     params['models'] = "jma_gsm"
 
-    # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession(".cache", expire_after=-1)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-
-    responses = openmeteo.weather_api(url, params=params)
+    responses = get_openmeteo_client().weather_api(url, params=params)
     # Process first location. Add a for-loop for multiple locations or weather models
     response = responses[0]
     if verbose:
@@ -91,26 +97,19 @@ def get_meteo(params: dict, verbose: bool = False) -> pd.DataFrame:
     # Process hourly data. The order of variables needs to be the same as requested.
     hourly = response.Hourly()
 
-    hourly_data = {
-        "date": pd.date_range(
-            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=hourly.Interval()),
-            inclusive="left",
-        )
-    }
-
-    for i, name in enumerate(params["hourly"]):
-        hourly_data[name] = hourly.Variables(i).ValuesAsNumpy()
-
-    hourly_dataframe = pd.DataFrame(data=hourly_data)
-    hourly_dataframe.set_index("date", inplace=True)
-    hourly_dataframe.index = hourly_dataframe.index.tz_convert(
-        response.Timezone().decode("utf-8")
+    # Timestamps are given in seconds since epoch (UTC)
+    timestamps = np.arange(hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype=np.int64) * 1_000_000_000
+    date_index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), name="date").tz_localize("UTC")
+    # ValuesAsNumpy returns a read-only view on the response buffer; the DataFrame constructor copies it
+    hourly_data = {name: hourly.Variables(i).ValuesAsNumpy() for i, name in enumerate(params["hourly"])}
+
+    hourly_dataframe = pd.DataFrame(
+        data=hourly_data, index=date_index.tz_convert(response.Timezone().decode("utf-8"))
     )
     hourly_dataframe = compute_is_daylight(hourly_dataframe, response.Latitude(), response.Longitude(), response.Timezone().decode("utf-8"))
-    hourly_dataframe['vapour_pressure_deficit'] = hourly_dataframe.apply(
-        lambda row: compute_vpd(row['temperature_2m'], row['relative_humidity_2m']), axis=1)
+    hourly_dataframe['vapour_pressure_deficit'] = compute_vpd(
+        hourly_dataframe['temperature_2m'].to_numpy(dtype=float),
+        hourly_dataframe['relative_humidity_2m'].to_numpy(dtype=float))
 
     return hourly_dataframe
 
@@ -119,45 +118,61 @@ def is_wet(precipitation, vapour_pressure_deficit):
     # Zandelin, P. (2021). Virtual weather data for apple scab monitoring and management.
     precipitation_threshold = 0.0
     vapour_pressure_deficit_threshold = get_default_vapour_pressure_deficit_threshold()
-    result = np.logical_or(
-        precipitation > precipitation_threshold,
-        vapour_pressure_deficit < vapour_pressure_deficit_threshold,
-    )
+    result = np.greater(precipitation, precipitation_threshold)
+    result |= np.less(vapour_pressure_deficit, vapour_pressure_deficit_threshold)  # in-place for arrays
+    return result
+
+
+def compute_is_wet(df_weather: pd.DataFrame) -> np.ndarray:
+    result = is_wet(df_weather["precipitation"].to_numpy(), df_weather["vapour_pressure_deficit"].to_numpy())
     return result
 
 
 def compute_leaf_wetness_duration(df_weather_day):
     # Zandelin, P. (2021). Virtual weather data for apple scab monitoring and management.
-    result = df_weather_day.apply(
-        lambda row: is_wet(row["precipitation"], row["vapour_pressure_deficit"]), axis=1
-    ).sum()
+    result = int(compute_is_wet(df_weather_day).sum())
+    return result
+
+
+def get_day_positions(df_weather: pd.DataFrame, dates) -> list[np.ndarray]:
+    # Positions of the hours of each requested date, in the requested order; raises KeyError for dates without data
+    index = df_weather.index.tz_localize(None) if df_weather.index.tz is not None else df_weather.index
+    index_days = index.to_numpy().astype("datetime64[D]")  # local calendar day of each hour
+    result = []
+    for day in dates:
+        day = pd.Timestamp(day).date()
+        positions = np.flatnonzero(index_days == np.datetime64(day, "D"))
+        if positions.size == 0:
+            raise KeyError(day.strftime("%Y-%m-%d"))
+        result.append(positions)
     return result
 
 
 class WeatherSummary:
     def __init__(self, dates, df_weather):
-        result_data = {"Date": []}
+        days = [pd.Timestamp(day).date() for day in dates]
+        result_data = {"Date": pd.to_datetime(days)}
         result_data.update({name: [] for name in self.get_variable_names()})
 
-        for day in dates:
-            result_data["Date"].append(day)
-            df_weather_day = df_weather.loc[day.strftime("%Y-%m-%d")]
-            leaf_wetness = float(compute_leaf_wetness_duration(df_weather_day))
-            has_rain_event = float(np.any(is_rain_event(df_weather_day)))
-            total_precipitation = df_weather_day["precipitation"].sum()
-            result_data["LeafWetness"].append(leaf_wetness)
-            result_data["HasRain"].append(has_rain_event)
-            result_data["Precipitation"].append(total_precipitation)
-
-            avg_temperature = df_weather_day["temperature_2m"].mean()
-            hours_humid = len(
-                df_weather_day[df_weather_day["relative_humidity_2m"] > 85.0]
-            )
-            result_data["Temperature"].append(avg_temperature)
-            result_data["HumidDuration"].append(hours_humid)
+        if days:
+            # Slice the requested period once, then reduce each day with the same per-day computation
+            df_weather = df_weather.loc[min(days).strftime("%Y-%m-%d"):max(days).strftime("%Y-%m-%d")]
+            for positions in get_day_positions(df_weather, days):
+                for name, value in self.summarize_day(df_weather.iloc[positions]).items():
+                    result_data[name].append(value)
 
         self.result = pd.DataFrame(result_data)
-        self.result["Date"] = pd.to_datetime(self.result["Date"])
+
+    @staticmethod
+    def summarize_day(df_weather_day: pd.DataFrame) -> dict:
+        result = {
+            "LeafWetness": float(compute_leaf_wetness_duration(df_weather_day)),
+            "HasRain": float(np.any(is_rain_event(df_weather_day))),
+            "Precipitation": df_weather_day["precipitation"].to_numpy().sum(),
+            "Temperature": df_weather_day["temperature_2m"].to_numpy().mean(),
+            "HumidDuration": np.count_nonzero(df_weather_day["relative_humidity_2m"].to_numpy() > 85.0),
+        }
+        return result
 
     @staticmethod
     def get_variable_names():
@@ -234,35 +249,32 @@ def compute_duration_and_temperature_wet_period(df_weather_infection: pd.DataFra
     # and a Tinf calculated by averaging T during wetness, disregarding interruptions.
     # p. 304 Rossi et al.
 
-    wet = df_weather_infection.apply(
-        lambda row: is_wet(row["precipitation"], row["vapour_pressure_deficit"]), axis=1
-    ).values
+    wet = compute_is_wet(df_weather_infection)
     temperature = df_weather_infection["temperature_2m"].to_numpy()
     wet_filled = fill_gaps(wet, max_gap=4)
-    wet_periods, num_periods = label(wet_filled)
-    indices = np.where((wet_periods == 2) & (wet == True))[0]
-    if indices.size > 0:
-        last_index = indices[-1]
-        wet_hours = np.sum(wet[: last_index + 1])
+    # Wet periods end (exclusive) at the falling edges of the filled wet series
+    period_ends = np.flatnonzero(np.diff(wet_filled.astype(np.int8), prepend=0, append=0) == -1)
+    if period_ends.size > 1:
+        # Only the hours up to the end of the second wet period are needed
+        wet_indices = np.flatnonzero(wet[: period_ends[1]])
+        last_index = wet_indices[-1]
+        wet_hours = wet_indices.size
         average_temperature = np.mean(temperature[: last_index + 1])
         return wet_hours, average_temperature
     return 0, None
 
 
 def summarize_rain(dates, df_weather: pd.DataFrame):
-    hourly_data = []
-    for day in dates:
-        df_weather_day = df_weather.loc[day.strftime("%Y-%m-%d")]
-        rain_event = is_rain_event(df_weather_day)
-
-        # Append hourly data with rain_event to the list
-        hourly_data.extend(
-            zip(df_weather_day.index, df_weather_day["precipitation"], rain_event)
-        )
-
-    # Create DataFrame from the collected hourly data
-    df_hourly = pd.DataFrame(
-        hourly_data,
-        columns=["Hourly Date", "Hourly Precipitation", "Hourly Rain Event"],
-    )
+    # Rain events are detected per day, as in the infection model
+    day_positions = get_day_positions(df_weather, dates)
+    if not day_positions:
+        return pd.DataFrame(columns=["Hourly Date", "Hourly Precipitation", "Hourly Rain Event"])
+
+    positions = np.concatenate(day_positions)
+    rain_event = np.concatenate([is_rain_event(df_weather.iloc[day]) for day in day_positions])
+    df_hourly = pd.DataFrame({
+        "Hourly Date": df_weather.index[positions],
+        "Hourly Precipitation": df_weather["precipitation"].to_numpy(dtype=float)[positions],
+        "Hourly Rain Event": rain_event,
+    })
     return df_hourly